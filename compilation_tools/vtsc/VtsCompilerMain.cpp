@@ -14,15 +14,18 @@
  * limitations under the License.
  */
 
+#include <android-base/logging.h>
 #include <dirent.h>
 #include <stdlib.h>
 #include <string.h>
 #include <sys/stat.h>
 #include <unistd.h>
 
+#include <fstream>
 #include <iostream>
+#include <string>
+#include <vector>
 
-#include <android-base/logging.h>
 #include "VtsCompilerUtils.h"
 #include "code_gen/CodeGenBase.h"
 
@@ -41,11 +44,14 @@ using namespace std;
 // where <base path> is a base path of where .vts input file or dir is
 // stored but should be excluded when computing the package path of generated
 // source or header output file(s).
+// To run multiple jobs in one process,
+//   Usage: vtsc -B<manifest file path>
+// where the manifest file holds the arguments of one of the above invocations
+// per line and an empty line ends each job, so arguments may contain spaces.
+// -b and -B are not supported in a manifest since -b changes the working
+// directory of later jobs.
 
-int main(int argc, char* argv[]) {
-#ifdef VTS_DEBUG
-  cout << "Android VTS Compiler (AVTSC)" << endl;
-#endif
+static int RunVtsc(int argc, char* argv[]) {
   int opt_count = 0;
   android::vts::VtsCompileMode mode = android::vts::kDriver;
   android::vts::VtsCompileFileType type = android::vts::VtsCompileFileType::kBoth;
@@ -157,3 +163,63 @@ int main(int argc, char* argv[]) {
   }
   return 0;
 }
+
+// Runs the given manifest job. Returns -1 if the job has a -b or -B option,
+// otherwise what RunVtsc returns for it.
+static int RunJob(char* program, vector<string>& args) {
+  vector<char*> job_argv;
+  job_argv.push_back(program);
+  for (auto& arg : args) {
+    if (!arg.compare(0, 2, "-b") || !arg.compare(0, 2, "-B")) {
+      cerr << __func__ << " unsupported option in a manifest job, " << arg
+           << "." << endl;
+      return -1;
+    }
+    job_argv.push_back(&arg[0]);
+  }
+  job_argv.push_back(nullptr);
+  return RunVtsc(job_argv.size() - 1, job_argv.data());
+}
+
+// Runs all jobs listed in the given manifest file. Returns -1 if the manifest
+// can't be opened or a job has an unsupported option, or the non-zero exit
+// code of the first job that returns one (only a job with too few arguments
+// does). Any other failing job exits the whole process with -1, so the jobs
+// after it are not run.
+static int RunBatch(char* program, const char* manifest_path) {
+  ifstream manifest(manifest_path);
+  if (!manifest) {
+    cerr << __func__ << " can't open the given manifest file, " << manifest_path
+         << "." << endl;
+    return -1;
+  }
+  vector<string> args;
+  string line;
+  while (true) {
+    bool eof = !getline(manifest, line);
+    if (!eof && !line.empty()) {
+      args.push_back(line);
+      continue;
+    }
+    if (!args.empty()) {
+      int ret = RunJob(program, args);
+      if (ret) {
+        return ret;
+      }
+      args.clear();
+    }
+    if (eof) {
+      return 0;
+    }
+  }
+}
+
+int main(int argc, char* argv[]) {
+#ifdef VTS_DEBUG
+  cout << "Android VTS Compiler (AVTSC)" << endl;
+#endif
+  if (argc == 2 && !strncmp(argv[1], "-B", 2)) {
+    return RunBatch(argv[0], &argv[1][2]);
+  }
+  return RunVtsc(argc, argv);
+}
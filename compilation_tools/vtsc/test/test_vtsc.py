@@ -14,18 +14,57 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
+import concurrent.futures
 import difflib
-import filecmp
-import getopt
+import io
 import logging
+import multiprocessing
 import os
 import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 import unittest
+import uuid
 
 from vts.utils.python.common import cmd_utils
 
+# Number of bytes read from each file per step when comparing files.
+COMPARE_CHUNK_SIZE = 64 * 1024
+
+# Hidl hal packages tested in DRIVER and PROFILER mode and their components.
+HIDL_HAL_COMPONENTS = [
+    ("android.hardware.nfc@1.0", ["Nfc", "NfcClientCallback", "types"]),
+    ("android.hardware.tests.bar@1.0", ["Bar"]),
+    ("android.hardware.tests.msgq@1.0", ["TestMsgQ"]),
+    ("android.hardware.tests.memory@1.0", ["MemoryTest"]),
+]
+# Hidl hal packages tested in FUZZER mode and their components.
+FUZZER_HAL_COMPONENTS = [
+    ("android.hardware.renderscript@1.0", ["Context", "Device", "types"]),
+]
+# Dir of the .vts files of the shared libraries tested in DRIVER mode.
+SHARED_LIB_SPEC_DIR = "test/vts/specification/lib/ndk/bionic/1.0"
+# Shared libraries tested in DRIVER mode.
+SHARED_LIB_COMPONENTS = ["libcV1"]
+
+# All test cases as (mode, hal package name, component name) tuples. The hal
+# package name is None for shared libraries.
+# Generator expressions are used so that the loop variables do not leak into
+# the module on Python 2.
+TEST_CASES = (
+    list((mode, hal_package_name, component_name)
+         for mode in ["DRIVER", "PROFILER"]
+         for hal_package_name, component_names in HIDL_HAL_COMPONENTS
+         for component_name in component_names) +
+    list(("DRIVER", None, component_name)
+         for component_name in SHARED_LIB_COMPONENTS) +
+    list(("FUZZER", hal_package_name, component_name)
+         for hal_package_name, component_names in FUZZER_HAL_COMPONENTS
+         for component_name in component_names))
+
 
 class VtscTester(unittest.TestCase):
     """Integration test runner for vtsc in generating the driver/profiler code.
@@ -35,12 +74,19 @@ class VtscTester(unittest.TestCase):
     Note: need to run the script from the source root to preserve the correct
           path.
 
+    There is one test method per entry of TEST_CASES, e.g. testDriverNfc.
+    The vtsc jobs of all test cases are run together in setUpClass so that
+    they can be batched and spread over worker threads; each test method
+    then only compares the output files of its own test case.
+
     Usage:
-        python test_vtsc.py path_to_vtsc canonical_dir output_dir
+        python test_vtsc.py -h hidl_gen_path [-p vtsc_path]
+        [-c canonical_dir] [-o output_dir] -t temp_dir
 
     example:
-        python test/vts/compilation_tools/vtsc/test/test_vtsc.py vtsc
-        test/vts/compilation_tools/vtsc/test/golden/ temp_output
+        python test/vts/compilation_tools/vtsc/test/test_vtsc.py -h hidl-gen
+        -p vtsc -c test/vts/compilation_tools/vtsc/test/golden/
+        -o temp_output -t temp_dir
 
     Attributes:
         _hidl_gen_path: the path to run hidl-gen
@@ -49,99 +95,192 @@ class VtscTester(unittest.TestCase):
         _output_dir: root directory that stores all output files.
         _errors: number of errors generates during the test.
         _temp_dir: temp dir to store the .vts file generated by hidl-gen.
+        _vtsc_jobs: list of vtsc argument lists queued by RunTest.
+        _file_pairs: dict mapping each entry of TEST_CASES to its list of
+                     (output_file, canonical_file) to compare.
+        _failed_commands: dict mapping each entry of TEST_CASES to its list
+                          of vtsc commands that failed.
     """
+    _hidl_gen_path = None
+    _vtsc_path = None
+    _canonical_dir = None
+    _output_dir = None
+    _temp_dir = None
+    _vtsc_jobs = []
+    _file_pairs = {}
+    _failed_commands = {}
 
-    def __init__(self, testName, hidl_gen_path, vtsc_path, canonical_dir,
-                 output_dir, temp_dir):
-        super(VtscTester, self).__init__(testName)
-        self._hidl_gen_path = hidl_gen_path
-        self._vtsc_path = vtsc_path
-        self._canonical_dir = canonical_dir
-        self._output_dir = output_dir
-        self._errors = 0
-        self._temp_dir = temp_dir
+    @classmethod
+    def SetPaths(cls, hidl_gen_path, vtsc_path, canonical_dir, output_dir,
+                 temp_dir):
+        """Sets the paths used by all test cases.
+
+        Args:
+            hidl_gen_path: the path to run hidl-gen
+            vtsc_path: the path to run vtsc.
+            canonical_dir: root directory contains canonical files.
+            output_dir: root directory that stores all output files.
+            temp_dir: temp dir to store the .vts file generated by hidl-gen.
+        """
+        cls._hidl_gen_path = hidl_gen_path
+        cls._vtsc_path = vtsc_path
+        cls._canonical_dir = canonical_dir
+        cls._output_dir = output_dir
+        cls._temp_dir = temp_dir
+
+    @classmethod
+    def setUpClass(cls):
+        """Generates the .vts files and runs vtsc for all test cases.
+
+        Removes the output dirs first to prevent interference from previous
+        runs.
+        """
+        cls.RemoveOutputDir()
+        hal_package_names = set(hal_package_name
+                                for _, hal_package_name, _ in TEST_CASES
+                                if hal_package_name)
+        for hal_package_name in sorted(hal_package_names):
+            cls.GenerateVtsFile(hal_package_name)
+        cls._vtsc_jobs = []
+        queued_tests = []
+        for test_case in TEST_CASES:
+            for test in cls.GetTests(*test_case):
+                file_pairs = cls.RunTest(*test)
+                queued_tests.append((test_case, cls._vtsc_jobs[-1],
+                                     file_pairs))
+        failed_jobs = cls.FlushVtscJobs()
+        cls._file_pairs = dict((test_case, []) for test_case in TEST_CASES)
+        cls._failed_commands = dict(
+            (test_case, []) for test_case in TEST_CASES)
+        for test_case, job, file_pairs in queued_tests:
+            if job in failed_jobs:
+                cls._failed_commands[test_case].append([cls._vtsc_path] +
+                                                       job)
+            else:
+                cls._file_pairs[test_case].extend(file_pairs)
 
     def setUp(self):
-        """Removes output dir to prevent interference from previous runs."""
-        self.RemoveOutputDir()
-
-    def tearDown(self):
-        """If successful, removes the output dir for clean-up."""
-        if self._errors == 0:
-            self.RemoveOutputDir()
-
-    def testAll(self):
-        """Run all tests. """
-        self.TestDriver()
-        self.TestProfiler()
-        self.TestFuzzer()
+        """Resets the error count."""
+        self._errors = 0
+
+    def CheckTestCase(self, test_case):
+        """Compares the output files of a test case with the canonical ones.
+
+        The outputs of failed vtsc commands are not compared; the failed
+        commands are reported instead.
+
+        Args:
+            test_case: tuple, an entry of TEST_CASES.
+        """
+        for vtsc_cmd in self._failed_commands[test_case]:
+            self.Error("vtsc failed: %s" % vtsc_cmd)
+        for output_file, canonical_file in self._file_pairs[test_case]:
+            self.CompareOutputFile(output_file, canonical_file)
         self.assertEqual(self._errors, 0)
 
-    def TestDriver(self):
-        """Run tests for DRIVER mode. """
-        logging.info("Running TestDriver test case.")
-        # Tests for Hidl Hals.
-        for package_path, component_names in zip(
-            ["android.hardware.nfc@1.0",
-             "android.hardware.tests.bar@1.0",
-             "android.hardware.tests.msgq@1.0",
-             "android.hardware.tests.memory@1.0"],
-            [["Nfc", "NfcClientCallback", "types"],
-             ["Bar"], ["TestMsgQ"], ["MemoryTest"]]):
-            self.GenerateVtsFile(package_path)
-            for component_name in component_names:
-                self.RunTest(
-                    "DRIVER",
-                    os.path.join(self._temp_dir, component_name + ".vts"),
-                    "%s.vts.h" % component_name,
-                    header_file_name="%s.vts.h" % component_name,
-                    file_type="HEADER")
-                self.RunTest(
-                    "DRIVER",
-                    os.path.join(self._temp_dir, component_name + ".vts"),
-                    "%s.driver.cpp" % component_name,
-                    file_type="SOURCE")
-        # Tests for shared libraries.
-        for component_name in ["libcV1"]:
-            self.RunTest("DRIVER",
-                         "test/vts/specification/lib/ndk/bionic/1.0/%s.vts" %
-                         component_name, "%s.driver.cpp" % component_name)
-
-    def TestProfiler(self):
-        """Run tests for PROFILER mode. """
-        logging.info("Running TestProfiler test case.")
-        #self.GenerateVtsFile("android.hardware.nfc@1.0")
-        for package_path, component_names in zip(
-            ["android.hardware.nfc@1.0",
-             "android.hardware.tests.bar@1.0",
-             "android.hardware.tests.msgq@1.0",
-             "android.hardware.tests.memory@1.0"],
-            [["Nfc", "NfcClientCallback", "types"],
-             ["Bar"], ["TestMsgQ"], ["MemoryTest"]]):
-            self.GenerateVtsFile(package_path)
-            for component_name in component_names:
-                self.RunTest(
-                    "PROFILER",
-                    os.path.join(self._temp_dir, component_name + ".vts"),
-                    "%s.vts.h" % component_name,
-                    header_file_name="%s.vts.h" % component_name,
-                    file_type="HEADER")
-                self.RunTest(
-                    "PROFILER",
-                    os.path.join(self._temp_dir, component_name + ".vts"),
-                    "%s.profiler.cpp" % component_name,
-                    file_type="SOURCE")
-
-    def TestFuzzer(self):
-        """Run tests for Fuzzer mode. """
-        logging.info("Running TestProfiler test case.")
-        self.GenerateVtsFile("android.hardware.renderscript@1.0")
-        for component_name in ["Context", "Device", "types"]:
-            self.RunTest(
-                "FUZZER",
-                os.path.join(self._temp_dir, component_name + ".vts"),
-                "%s.fuzzer.cpp" % component_name,
-                file_type="SOURCE")
+    @classmethod
+    def GetTests(cls, mode, hal_package_name, component_name):
+        """Lists the RunTest arguments for a test case.
+
+        Args:
+            mode: the vtsc mode for generated code. e.g. DRIVER / PROFILER.
+            hal_package_name: name of hal package e.g. android.hardware.nfc@1.0
+                              or None for a shared library.
+            component_name: name of the component e.g. Nfc.
+
+        Returns:
+            list of tuples, the RunTest arguments of each test.
+        """
+        if hal_package_name is None:
+            return [(mode,
+                     os.path.join(SHARED_LIB_SPEC_DIR,
+                                  component_name + ".vts"),
+                     "%s.driver.cpp" % component_name)]
+        vts_file_path = cls.GetVtsFilePath(hal_package_name, component_name)
+        source_file_name = "%s.%s.cpp" % (component_name, mode.lower())
+        tests = []
+        if mode != "FUZZER":
+            header_file_name = "%s.vts.h" % component_name
+            tests.append((mode, vts_file_path, header_file_name,
+                          header_file_name, "HEADER"))
+        tests.append((mode, vts_file_path, source_file_name, "", "SOURCE"))
+        return tests
+
+    @classmethod
+    def FlushVtscJobs(cls):
+        """Runs all vtsc jobs queued by RunTest.
+
+        The jobs are split into one manifest per worker thread and each
+        manifest is handled by a single vtsc process, so the vtsc startup
+        cost is paid once per worker instead of once per job. A failing job
+        exits vtsc and loses the rest of its manifest, so the jobs of a
+        failed manifest are re-run one per vtsc process to find the failing
+        ones and still produce the outputs of the others.
+
+        Returns:
+            list of vtsc argument lists, the jobs that failed.
+        """
+        jobs, cls._vtsc_jobs = cls._vtsc_jobs, []
+        if not jobs:
+            return []
+        worker_count = min(multiprocessing.cpu_count(), len(jobs))
+        batches = [jobs[i::worker_count] for i in range(worker_count)]
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=worker_count) as executor:
+            return_codes = list(executor.map(cls.RunVtscBatch, batches))
+        failed_jobs = []
+        for batch, return_code in zip(batches, return_codes):
+            if (return_code == 0):
+                continue
+            if len(batch) == 1:
+                failed_jobs.extend(batch)
+                continue
+            logging.info("vtsc failed on a batch of %d jobs, re-running "
+                         "them one by one.", len(batch))
+            for job in batch:
+                if cls.RunVtscBatch([job]) != 0:
+                    failed_jobs.append(job)
+        return failed_jobs
+
+    @classmethod
+    def RunVtscBatch(cls, jobs):
+        """Runs the given vtsc jobs in one vtsc process.
+
+        vtsc is spawned with close_fds=False since the test process holds
+        no descriptors that need hiding from it, which saves closing every
+        possible descriptor in the child on each spawn.
+
+        The manifest holds one argument per line and ends each job with an
+        empty line, so arguments may contain spaces.
+
+        Args:
+            jobs: list of vtsc argument lists.
+
+        Returns:
+            int, the return code of vtsc.
+        """
+        manifest = tempfile.NamedTemporaryFile(
+            "w", suffix=".txt", delete=False)
+        with manifest:
+            for job in jobs:
+                for arg in job:
+                    manifest.write(arg + "\n")
+                manifest.write("\n")
+        vtsc_cmd = [cls._vtsc_path, "-B" + manifest.name]
+        try:
+            with open(os.devnull, "w") as devnull:
+                proc = subprocess.Popen(
+                    vtsc_cmd,
+                    stdout=devnull,
+                    stderr=subprocess.PIPE,
+                    close_fds=False)
+                _, stderr = proc.communicate()
+        finally:
+            os.remove(manifest.name)
+        if proc.returncode != 0 and len(jobs) == 1:
+            logging.error("Fail to execute command: %s (stderr: %s)",
+                          [cls._vtsc_path] + jobs[0], stderr)
+        return proc.returncode
 
     def RunFuzzerTest(self, mode, vts_file_path, source_file_name):
         vtsc_cmd = [
@@ -157,75 +296,96 @@ class VtscTester(unittest.TestCase):
                                           source_file_name)
         self.CompareOutputFile(output_source_file, canonical_source_file)
 
-    def GenerateVtsFile(self, hal_package_name):
+    @classmethod
+    def GenerateVtsFile(cls, hal_package_name):
         """Run hidl-gen to generate the .vts files for the give hal package.
 
+        The .vts files are kept in the per-package dir created by hidl-gen,
+        so packages with components of the same name (e.g. types) do not
+        overwrite each other.
+
         Args:
             hal_package_name: name of hal package e.g. android.hardware.nfc@1.0
+
+        Raises:
+            RuntimeError if hidl-gen fails.
         """
         hidl_gen_cmd = [
-            self._hidl_gen_path, "-o" + self._temp_dir, "-Lvts",
+            cls._hidl_gen_path, "-o" + cls._temp_dir, "-Lvts",
             "-randroid.hardware:hardware/interfaces",
             "-randroid.hidl:system/libhidl/transport", hal_package_name
         ]
         return_code = cmd_utils.RunCommand(hidl_gen_cmd)
         if (return_code != 0):
-            self.Error("Fail to execute command: %s" % hidl_gen_cmd)
+            raise RuntimeError("Fail to execute command: %s" % hidl_gen_cmd)
+
+    @classmethod
+    def GetVtsFilePath(cls, hal_package_name, component_name):
+        """Returns the path of a .vts file generated by GenerateVtsFile.
+
+        Args:
+            hal_package_name: name of hal package e.g. android.hardware.nfc@1.0
+            component_name: name of the component e.g. Nfc.
+        """
         [hal_name, hal_version] = hal_package_name.split("@")
-        output_dir = os.path.join(self._temp_dir,
-                                  hal_name.replace(".", "/"), hal_version)
-        for file in os.listdir(output_dir):
-            if file.endswith(".vts"):
-                os.rename(
-                    os.path.join(output_dir, file),
-                    os.path.join(self._temp_dir, file))
-
-    def RunTest(self,
+        return os.path.join(cls._temp_dir, hal_name.replace(".", "/"),
+                            hal_version, component_name + ".vts")
+
+    @classmethod
+    def RunTest(cls,
                 mode,
                 vts_file_path,
                 output_file_name,
                 header_file_name="",
                 file_type="BOTH"):
-        """Run vtsc with given mode for the give vts file and compare the
-           output results.
+        """Queues a vtsc job with given mode for the give vts file.
+
+        The job is run by the next FlushVtscJobs call.
 
         Args:
             mode: the vtsc mode for generated code. e.g. DRIVER / PROFILER.
             vts_file_path: path of the input vts file.
-            source_file_name: name of the generated source file.
+            output_file_name: name of the generated output file.
+            header_file_name: name of the generated header file.
             file_type: type of file e.g. HEADER / SOURCE / BOTH.
+
+        Returns:
+            list of (output_file, canonical_file) to compare once the job
+            has run.
+
+        Raises:
+            ValueError if file_type is unknown, or an argument of the job
+            is empty or contains a newline, which the vtsc manifest can't
+            hold.
         """
+        mode_output_dir = os.path.join(cls._output_dir, mode)
+        mode_canonical_dir = os.path.join(cls._canonical_dir, mode)
+        output_file = os.path.join(mode_output_dir, output_file_name)
         if (file_type == "BOTH"):
-            vtsc_cmd = [
-                self._vtsc_path, "-m" + mode, vts_file_path,
-                os.path.join(self._output_dir, mode),
-                os.path.join(self._output_dir, mode, output_file_name)
-            ]
+            job = ["-m" + mode, vts_file_path, mode_output_dir, output_file]
         else:
-            vtsc_cmd = [
-                self._vtsc_path, "-m" + mode, "-t" + file_type, vts_file_path,
-                os.path.join(self._output_dir, mode, output_file_name)
-            ]
-        return_code = cmd_utils.RunCommand(vtsc_cmd)
-        if (return_code != 0):
-            self.Error("Fail to execute command: %s" % vtsc_cmd)
+            job = ["-m" + mode, "-t" + file_type, vts_file_path, output_file]
+        for arg in job:
+            if not arg or "\n" in arg:
+                raise ValueError("Unsupported vtsc argument: %r" % arg)
+        cls._vtsc_jobs.append(job)
 
+        file_pairs = []
         if (file_type == "HEADER" or file_type == "BOTH"):
             if not header_file_name:
                 header_file_name = vts_file_path + ".h"
-            canonical_header_file = os.path.join(self._canonical_dir, mode,
+            canonical_header_file = os.path.join(mode_canonical_dir,
                                                  header_file_name)
-            output_header_file = os.path.join(self._output_dir, mode,
+            output_header_file = os.path.join(mode_output_dir,
                                               header_file_name)
-            self.CompareOutputFile(output_header_file, canonical_header_file)
+            file_pairs.append((output_header_file, canonical_header_file))
         elif (file_type == "SOURCE" or file_type == "BOTH"):
-            canonical_source_file = os.path.join(self._canonical_dir, mode,
+            canonical_source_file = os.path.join(mode_canonical_dir,
                                                  output_file_name)
-            output_source_file = os.path.join(self._output_dir, mode,
-                                              output_file_name)
-            self.CompareOutputFile(output_source_file, canonical_source_file)
+            file_pairs.append((output_file, canonical_source_file))
         else:
-            self.Error("No such file_type: %s" % file_type)
+            raise ValueError("No such file_type: %s" % file_type)
+        return file_pairs
 
     def CompareOutputFile(self, output_file, canonical_file):
         """Compares a given file and the corresponding one under canonical_dir.
@@ -237,22 +397,69 @@ class VtscTester(unittest.TestCase):
         if not os.path.isfile(canonical_file):
             self.Error("Generated unexpected file: %s (for %s)" %
                        (output_file, canonical_file))
+        elif not os.path.isfile(output_file):
+            self.Error("Missing output file: %s (for %s)" %
+                       (output_file, canonical_file))
         else:
-            if not filecmp.cmp(output_file, canonical_file):
+            if not self.FilesEqual(output_file, canonical_file):
                 self.Error(
                     "output file: %s does not match the canonical_file: "
                     "%s" % (output_file, canonical_file))
                 self.PrintDiffFiles(output_file, canonical_file)
 
+    def FilesEqual(self, file_path1, file_path2):
+        """Checks whether two files have the same content.
+
+        Files of different sizes are not read at all. Otherwise both files
+        are read chunk by chunk and the comparison stops at the first chunk
+        that differs.
+
+        Args:
+            file_path1: path of the first file.
+            file_path2: path of the second file.
+
+        Returns:
+            bool, True iff the contents of the files are equal.
+        """
+        if os.path.getsize(file_path1) != os.path.getsize(file_path2):
+            return False
+        buffer1 = bytearray(COMPARE_CHUNK_SIZE)
+        buffer2 = bytearray(COMPARE_CHUNK_SIZE)
+        with io.open(file_path1, "rb", buffering=0) as file1:
+            with io.open(file_path2, "rb", buffering=0) as file2:
+                while True:
+                    size1 = file1.readinto(buffer1)
+                    size2 = file2.readinto(buffer2)
+                    if size1 != size2:
+                        return False
+                    if not size1:
+                        return True
+                    # On a short read the bytes past size are left over from
+                    # the previous chunk, which was equal in both buffers, so
+                    # the whole buffers can still be compared.
+                    if buffer1 != buffer2:
+                        return False
+
     def PrintDiffFiles(self, output_file, canonical_file):
-        with open(output_file, 'r') as file1:
-            with open(canonical_file, 'r') as file2:
-                diff = difflib.unified_diff(
-                    file1.readlines(),
-                    file2.readlines(),
-                    fromfile=output_file,
-                    tofile=canonical_file)
-        for line in diff:
+        """Logs the unified diff between an output and a canonical file.
+
+        difflib needs random access to both sequences, so the lines of each
+        file are loaded straight from the file object; the diff itself is
+        logged as it is generated.
+
+        Args:
+            output_file: name of the output file.
+            canonical_file: name of the canonical file.
+        """
+        with open(output_file, "r") as file1:
+            output_lines = list(file1)
+        with open(canonical_file, "r") as file2:
+            canonical_lines = list(file2)
+        for line in difflib.unified_diff(
+                output_lines,
+                canonical_lines,
+                fromfile=output_file,
+                tofile=canonical_file):
             logging.error(line)
 
     def Error(self, string):
@@ -260,47 +467,78 @@ class VtscTester(unittest.TestCase):
         logging.error(string)
         self._errors += 1
 
-    def RemoveOutputDir(self):
-        """Remove the output_dir if it exists."""
-        if os.path.exists(self._output_dir):
-            logging.info("rm -rf %s", self._output_dir)
-            shutil.rmtree(self._output_dir)
-        if os.path.exists(self._temp_dir):
-            shutil.rmtree(self._temp_dir)
+    @classmethod
+    def RemoveOutputDir(cls):
+        """Remove the output_dir and temp_dir if they exist.
+
+        Each dir is renamed out of the way first and then deleted in a
+        background thread, so the deletion overlaps with the test run.
+        """
+        for dir_path in [cls._output_dir, cls._temp_dir]:
+            dir_path = os.path.normpath(dir_path)
+            if os.path.exists(dir_path):
+                logging.info("rm -rf %s", dir_path)
+                trash_dir = "%s.trash.%s" % (dir_path, uuid.uuid4().hex)
+                os.rename(dir_path, trash_dir)
+                threading.Thread(
+                    target=shutil.rmtree, args=(trash_dir, )).start()
+
+
+def _MakeTestMethod(test_case):
+    """Returns a VtscTester test method checking the given test case.
+
+    Args:
+        test_case: tuple, an entry of TEST_CASES.
+    """
+    mode, _, component_name = test_case
+
+    def testMethod(self):
+        self.CheckTestCase(test_case)
+
+    testMethod.__doc__ = "Checks the %s output of %s." % (mode,
+                                                           component_name)
+    return testMethod
+
+
+for _test_case in TEST_CASES:
+    _mode, _, _component_name = _test_case
+    setattr(VtscTester, "test%s%s%s" % (_mode.title(),
+                                        _component_name[0].upper(),
+                                        _component_name[1:]),
+            _MakeTestMethod(_test_case))
+del _test_case, _mode, _component_name
 
 
 if __name__ == "__main__":
-    # Default values of the input parameter, could be overridden by command.
-    vtsc_path = "vtsc"
-    canonical_dir = "test/vts/compilation_tools/vtsc/test/golden/"
-    output_dir = "test/vts/compilation_tools/vtsc/test/temp_coutput/"
-    # Parse the arguments and set the provided value for
-    # hidl-gen/vtsc_path/canonical_dar/output_dir.
-    try:
-        opts, _ = getopt.getopt(sys.argv[1:], "h:p:c:o:t:")
-    except getopt.GetoptError, err:
-        print "Usage: python test_vtsc.py [-h hidl_gen_path] [-p vtsc_path] " \
-              "[-c canonical_dir] [-o output_dir] [-t temp_dir]"
-        sys.exit(1)
-    for opt, val in opts:
-        if opt == "-h":
-            hidl_gen_path = val
-        elif opt == "-p":
-            vtsc_path = val
-        elif opt == "-c":
-            canonical_dir = val
-        elif opt == "-o":
-            output_dir = val
-        elif opt == "-t":
-            temp_dir = val
-        else:
-            print "unhandled option %s" % (opt, )
-            sys.exit(1)
+    # -h is taken by the hidl-gen path, so help is only available as --help.
+    parser = argparse.ArgumentParser(
+        description="Integration test for vtsc.", add_help=False)
+    parser.add_argument(
+        "--help", action="help", help="show this help message and exit")
+    parser.add_argument(
+        "-h", dest="hidl_gen_path", required=True, help="path to run hidl-gen")
+    parser.add_argument(
+        "-p", dest="vtsc_path", default="vtsc", help="path to run vtsc")
+    parser.add_argument(
+        "-c",
+        dest="canonical_dir",
+        default="test/vts/compilation_tools/vtsc/test/golden/",
+        help="root directory of the canonical files")
+    parser.add_argument(
+        "-o",
+        dest="output_dir",
+        default="test/vts/compilation_tools/vtsc/test/temp_coutput/",
+        help="root directory of the output files")
+    parser.add_argument(
+        "-t",
+        dest="temp_dir",
+        required=True,
+        help="temp dir to store the .vts files generated by hidl-gen")
+    args = parser.parse_args()
 
-    suite = unittest.TestSuite()
-    suite.addTest(
-        VtscTester('testAll', hidl_gen_path, vtsc_path, canonical_dir,
-                   output_dir, temp_dir))
+    VtscTester.SetPaths(args.hidl_gen_path, args.vtsc_path,
+                        args.canonical_dir, args.output_dir, args.temp_dir)
+    suite = unittest.TestLoader().loadTestsFromTestCase(VtscTester)
     result = unittest.TextTestRunner(verbosity=2).run(suite)
     if not result.wasSuccessful():
         sys.exit(-1)
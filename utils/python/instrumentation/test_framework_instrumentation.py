@@ -98,11 +98,8 @@ def FindEvent(name, category=DEFAULT_CATEGORY):
     Returns:
         TestFrameworkInstrumentationEvent object if found; None otherwise.
     """
-    for event in reversed(tfie.event_stack):
-        if event.Match(name, category):
-            return event
-
-    return None
+    events = tfie.active_events.get((name, category))
+    return events[-1] if events else None
 
 
 def Count(name, category=DEFAULT_CATEGORY):
@@ -114,12 +111,9 @@ def Count(name, category=DEFAULT_CATEGORY):
         name: string, name of the event.
         category: string, category of the event. Default category will be used if not specified.
     """
-    name, category = tfie.NormalizeNameCategory(name, category)
     # TODO(yuexima): give warning when there's illegal char, but only once for each combination.'
-    if (name, category) not in counts:
-        counts[(name, category)] = [time.time()]
-    else:
-        counts[name, category].append(time.time())
+    key = tfie.NormalizeNameCategory(name, category)
+    counts.setdefault(key, []).append(time.time())
 
 
 def GenerateTextReport():
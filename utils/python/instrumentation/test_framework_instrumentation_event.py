@@ -27,18 +27,30 @@ LOGGING_TEMPLATE = LOGGING_PREFIX + ' {category}: {name} {status}'
 # In event init method, these characters are joint by '|' as regex. Modifications to
 # the replacing logic be required if escape character is needed.
 ILLEGAL_CHARS = ':\t\r\n'
+# Clock used for cpu timestamps. time.clock is deprecated since Python 3.3.
+try:
+    _cpu_clock = time.process_time
+except AttributeError:
+    _cpu_clock = time.clock
 
 # A list of events that have began but not ended.
 event_stack = []
+# A dict mapping (name, category) to the list of events in event_stack with
+# that name and category, in the order they began.
+active_events = {}
 # A list of events that have finished
 # TODO(yuexima): use a new class to store data
 event_data = []
+# Cache of NormalizeNameCategory results keyed by the given (name, category).
+_normalized_keys = {}
 
 
 def NormalizeNameCategory(name, category):
     """Replaces illegal characters in name and category.
 
     Illegal characters defined in ILLEGAL_CHARS will be replaced with '_'.
+    Results are cached, so each distinct name and category pair is only
+    checked once and always maps to the same tuple object.
 
     Args:
         name: string
@@ -47,11 +59,15 @@ def NormalizeNameCategory(name, category):
     Returns:
         a tuple (string, string), name and category
     """
-    if set(ILLEGAL_CHARS) & set(category + name):
-        category = re.sub('|'.join(ILLEGAL_CHARS), '_', category)
-        name = re.sub('|'.join(ILLEGAL_CHARS), '_', name)
+    key = _normalized_keys.get((name, category))
+    if key is None:
+        key = (name, category)
+        if set(ILLEGAL_CHARS) & set(category + name):
+            key = (re.sub('|'.join(ILLEGAL_CHARS), '_', name),
+                   re.sub('|'.join(ILLEGAL_CHARS), '_', category))
+        _normalized_keys[name, category] = key
 
-    return name, category
+    return key
 
 
 class TestFrameworkInstrumentationEvent(object):
@@ -81,6 +97,8 @@ class TestFrameworkInstrumentationEvent(object):
         _disable_subevent_logging: bool, whether to disable logging for events created after this
                                    event begins and before this event ends. This will overwrite
                                    subevent's logging setting if set to True.
+        _key: tuple (string, string), the normalized name and category, used as the key in
+              active_events.
     """
     category = None
     name = None
@@ -96,7 +114,8 @@ class TestFrameworkInstrumentationEvent(object):
     timestamp_end_wall = -1
 
     def __init__(self, name, category):
-        self.name, self.category = NormalizeNameCategory(name, category)
+        self._key = NormalizeNameCategory(name, category)
+        self.name, self.category = self._key
 
         if (name, category) != (self.name, self.category):
             self.LogW('TestFrameworkInstrumentation: illegal character detected in '
@@ -120,7 +139,7 @@ class TestFrameworkInstrumentationEvent(object):
                                       event begins and before this event ends. This will overwrite
                                       subevent's logging setting if set to True.
         """
-        timestamp_begin_cpu = time.clock()
+        timestamp_begin_cpu = _cpu_clock()
         timestamp_begin_wall = time.time()
         global event_stack
         if event_stack and event_stack[-1]._disable_subevent_logging:
@@ -155,10 +174,11 @@ class TestFrameworkInstrumentationEvent(object):
         self.timestamp_begin_cpu = timestamp_begin_cpu
         self.timestamp_begin_wall = timestamp_begin_wall
         event_stack.append(self)
+        active_events.setdefault(self._key, []).append(self)
 
     def End(self):
         """Performs logging action for the end of this event."""
-        timestamp_end_cpu = time.clock()
+        timestamp_end_cpu = _cpu_clock()
         timestamp_end_wall = time.time()
         if self.status == 0:
             self.LogE('TestFrameworkInstrumentation: event %s has not yet began. '
@@ -187,6 +207,7 @@ class TestFrameworkInstrumentationEvent(object):
         event_data.append(self)
         global event_stack
         event_stack.remove(self)
+        self._RemoveFromActiveEvents()
 
     def CheckEnded(self, remove_reason=''):
         """Checks whether this event has ended and remove it if not.
@@ -231,6 +252,14 @@ class TestFrameworkInstrumentationEvent(object):
         self.status = 3
         global event_stack
         event_stack.remove(self)
+        self._RemoveFromActiveEvents()
+
+    def _RemoveFromActiveEvents(self):
+        """Removes this event from active_events."""
+        events = active_events[self._key]
+        events.remove(self)
+        if not events:
+            del active_events[self._key]
 
     def LogD(self, *args):
         """Wrapper function for logging.debug"""
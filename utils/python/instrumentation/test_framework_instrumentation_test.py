@@ -31,6 +31,7 @@ class TestFrameworkInstrumentationTest(unittest.TestCase):
         self.name = 'name_default'
         tfie.event_data = []
         tfie.event_stack = []
+        tfie.active_events = {}
         tfi.counts = {}
 
     def testEventName(self):
@@ -66,6 +67,15 @@ class TestFrameworkInstrumentationTest(unittest.TestCase):
         self.assertEqual(event.status, 2)
         self.assertIsNone(event.error)
 
+    def testEndMatchSameName(self):
+        """Tests End command with multiple events of the same name."""
+        event1 = tfi.Begin(self.name, self.category)
+        event2 = tfi.Begin(self.name, self.category)
+        self.assertIs(tfi.End(self.name, self.category), event2)
+        self.assertIs(tfi.FindEvent(self.name, self.category), event1)
+        self.assertIs(tfi.End(self.name, self.category), event1)
+        self.assertIsNone(tfi.FindEvent(self.name, self.category))
+
     def testEndFromOtherModule(self):
         """Tests the use of End command from another module."""
         event = tfi.Begin(self.name, self.category)
@@ -209,6 +219,14 @@ class TestFrameworkInstrumentationTest(unittest.TestCase):
         tfi.Count(self.name)
         self.assertEqual(len(tfi.counts), 2)
 
+    def testCountIllegalCharacters(self):
+        """Tests the count API with illegal characters in name."""
+        tfi.Count('name:1', self.category)
+        tfi.Count('name:1', self.category)
+        tfi.Count('name\t1', self.category)
+        self.assertEqual(len(tfi.counts), 1)
+        self.assertEqual(len(tfi.counts['name_1', self.category]), 3)
+
     def testGenerateTextReport(self):
         """Tests the GenerateTextReport method."""
         event = tfi.Begin('name1', 'cat1', disable_subevent_logging=True)
@@ -60,6 +60,11 @@ class ShellMirror(mirror_object.MirrorObject):
     def Execute(self, command, no_except=False):
         '''Execute remote shell commands on device.
 
+        The whole command list is sent to the device in one RPC. Outputs
+        that were too large for the response are spilled to tmp files on the
+        device; those are pulled and then removed with a single adb shell
+        call.
+
         Args:
             command: string or a list of string, shell commands to execute on
                      device.
@@ -79,25 +84,38 @@ class ShellMirror(mirror_object.MirrorObject):
             }
         result = self._client.ExecuteShellCommand(command, no_except)
 
-        tmp_dir = tempfile.mkdtemp()
+        tmp_dir = None
+        pulled_files = []
         pattern = re.compile(self.TMP_FILE_PATTERN)
 
-        for result_val, result_type in zip(
-            [result[const.STDOUT], result[const.STDERR]],
-            ["stdout", "stderr"]):
-            for index, val in enumerate(result_val):
-                # If val is a tmp file name, pull the file and set the contents
-                # to result.
-                if pattern.match(val):
-                    tmp_file = os.path.join(tmp_dir, result_type + str(index))
-                    logging.debug("pulling file: %s to %s", val, tmp_file)
-                    self._adb.pull(val, tmp_file)
-                    result_val[index] = open(tmp_file, "r").read()
-                    self._adb.shell("rm -f %s" % val)
-                else:
-                    result_val[index] = val
-
-        shutil.rmtree(tmp_dir)
+        try:
+            for result_val, result_type in zip(
+                [result[const.STDOUT], result[const.STDERR]],
+                ["stdout", "stderr"]):
+                for index, val in enumerate(result_val):
+                    # If val is a tmp file name, pull the file and set the
+                    # contents to result.
+                    if pattern.match(val):
+                        if tmp_dir is None:
+                            tmp_dir = tempfile.mkdtemp()
+                        tmp_file = os.path.join(tmp_dir,
+                                                result_type + str(index))
+                        logging.debug("pulling file: %s to %s", val, tmp_file)
+                        self._adb.pull(val, tmp_file)
+                        pulled_files.append(val)
+                        result_val[index] = open(tmp_file, "r").read()
+                    else:
+                        result_val[index] = val
+        finally:
+            # A failing rm is only logged so that it can't mask an error
+            # raised while pulling the files.
+            if pulled_files:
+                try:
+                    self._adb.shell("rm -f %s" % " ".join(pulled_files))
+                except Exception as e:
+                    logging.exception(e)
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir)
         logging.debug("resp for VTS_AGENT_COMMAND_EXECUTE_SHELL_COMMAND: %s",
                       result)
         return result